@@ -15,7 +15,8 @@ class ComplianceChecker:
         # HINT: Initialize PII detector
         self.pii_detector = PIIDetector()  # HINT: PIIDetector()
 
-    def check_compliance(self, text: str, compliance_standards: List[str] = None, industry: str = "travel") -> Dict[str, Any]:
+    def check_compliance(self, text: str, compliance_standards: List[str] = None, industry: str = "travel",
+                         pii_result: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Checks the text for compliance violations
         
@@ -25,22 +26,31 @@ class ComplianceChecker:
         3. Build violations list if PII detected
         4. Determine if compliant based on standards
         5. Return dict with compliant, violations, remediation, detected_pii_count
+
+        pii_result may be passed in when the caller has already scanned the text
+        (GovernanceGate does this from its fused scan)
         """
         compliance_standards = compliance_standards or []
         violations = []
         is_compliant = True
+
+        # Fast path: nothing PII-like can be in empty/whitespace-only text
+        if not text or text.isspace():
+            return {
+                'compliant': True,
+                'violations': [],
+                'remediation': "No action required",
+                'detected_pii_count': 0
+            }
         
         # HINT: Check for PII using Guardrail PII Detector
-        pii_result = self.pii_detector.detect(text)
-        
-        detected_pii = []
-        if pii_result['detected']:
-            for entity in pii_result['entities']:
-                detected_pii.append(f"{entity['type']}: {entity['text']}")
+        if pii_result is None:
+            pii_result = self.pii_detector.detect(text)
         
+        detected_pii = pii_result['detected']
         if detected_pii:
-            # HINT: Add PII violation message (limit to first 5)
-            violations.append(f"PII Detected: {', '.join(detected_pii[:5])}...")
+            # HINT: Add PII violation (limit to first 5; formatted only on display)
+            violations.append(('pii', tuple(pii_result['entities'][:5])))
             
             # HINT: If strict compliance needed (GDPR or HIPAA), mark as non-compliant
             if "GDPR" in compliance_standards or "HIPAA" in compliance_standards:
@@ -54,4 +64,18 @@ class ComplianceChecker:
             'violations': violations,
             'remediation': remediation,
             'detected_pii_count': pii_result['count']
-        }
\ No newline at end of file
+        }
+
+    def check_many(self, texts: List[str], compliance_standards: List[str] = None,
+                   industry: str = "travel") -> List[Dict[str, Any]]:
+        """
+        Checks a batch of texts for compliance violations
+
+        PII detection for the whole batch runs in parallel across processes
+        (PIIDetector.detect_many); the compliance rules are then applied per text
+        """
+        pii_results = self.pii_detector.detect_many(texts)
+        return [
+            self.check_compliance(text, compliance_standards, industry, pii_result=pii_result)
+            for text, pii_result in zip(texts, pii_results)
+        ]
@@ -0,0 +1,56 @@
+"""
+Content Safety Coalescer
+Shares one Azure Content Safety request between concurrent validations of
+the same text, with a bounded wait
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict
+
+from azure.ai.contentsafety.models import AnalyzeTextOptions
+
+
+class ContentSafetyCoalescer:
+    """Deduplicates in-flight Azure Content Safety analyze_text calls"""
+
+    def __init__(self, client, timeout: float = 10.0, max_workers: int = 32):
+        self.client = client
+        self.timeout = timeout
+
+        # Requests run here so every caller, including the one that started a
+        # request, can stop waiting at the same deadline
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="content-safety")
+
+        # Text -> result of the request currently analysing it
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def analyze(self, text: str, timeout: float = None):
+        """
+        Analyze text, joining an identical request if one is already running
+
+        Waits at most timeout seconds and then raises
+        concurrent.futures.TimeoutError (a distinct class from the builtin
+        TimeoutError before Python 3.11); Azure errors are re-raised as is
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            future = self._in_flight.get(text)
+            started = future is None
+            if started:
+                future = self._pool.submit(self._analyze_one, text, timeout)
+                self._in_flight[text] = future
+        if started:
+            # Outside the lock: the callback runs right here if the request already finished
+            future.add_done_callback(lambda done: self._forget(text, done))
+        return future.result(timeout)
+
+    def _analyze_one(self, text: str, timeout: float):
+        # azure-core's timeout caps the whole operation, retries included,
+        # so an abandoned request doesn't outlive its callers for long
+        return self.client.analyze_text(AnalyzeTextOptions(text=text), timeout=timeout, read_timeout=timeout)
+
+    def _forget(self, text: str, future: Future):
+        with self._lock:
+            if self._in_flight.get(text) is future:
+                del self._in_flight[text]
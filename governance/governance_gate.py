@@ -3,10 +3,22 @@ Governance Gate
 RUBRIC: Governance & Guardrails - GovernanceGate orchestrates safety checks (3 marks)
 TASK: Implement main governance orchestrator with audit logging
 """
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 import datetime
+import functools
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
 from governance.safety_validator import SafetyValidator
 from governance.compliance_checker import ComplianceChecker
+from guardrails.pii_detector import PIIEntity
+from guardrails.re_backend import compile_pattern
 
 class GovernanceGate:
     """The main orchestrator that coordinates all governance checks"""
@@ -16,20 +28,80 @@ class GovernanceGate:
         self.compliance_checker = ComplianceChecker()
         self.audit_log = []
 
-    def validate_input(self, text: str) -> Dict[str, Any]:
-        """Validates user input before processing"""
-        safety_result = self.safety_validator.validate(text)
-        compliance_result = self.compliance_checker.check_compliance(text, compliance_standards=["GDPR"])
+        # Output validation is lenient - only profanity and hate speech
+        self.output_strict_patterns = ['fuck', 'shit', 'bitch', 'racist', 'nazi', 'supremacist']
+
+        # Audit entries are handed to a background writer so validation never
+        # waits on the log; the bounded queue applies backpressure if it lags
+        self._audit_queue = queue.Queue(maxsize=10000)
+        self._audit_writer = threading.Thread(target=self._drain_audit_queue, name="audit-log-writer", daemon=True)
+        self._audit_writer.start()
+
+        # Fuse PII and prompt-injection patterns into one alternation so
+        # validate_input walks the text once; group names carry the domain
+        # prefix (pii_<type>, inj_<n>) used to fan matches back out
+        self._injection_names = {f"inj_{i}": p for i, p in enumerate(self.safety_validator.injection_patterns)}
+        groups = [f"(?P<pii_{k}>{v})" for k, v in self.compliance_checker.pii_detector.patterns.items()]
+        groups += [f"(?P<{name}>(?i:{p}))" for name, p in self._injection_names.items()]
+        self._fused = compile_pattern("|".join(groups))
+
+        # With Hyperscan installed, injection phrases and safety keywords go into
+        # one SIMD multi-pattern database instead (PII spans stay on the regex)
+        self._hs_db = None
+        if hyperscan is not None:
+            self._hs_db, self._hs_table = self._compile_hyperscan()
+            # Scratch space is per scanning thread, so concurrent scans never wait
+            self._hs_local = threading.local()
+
+        self._scan_cached = functools.lru_cache(maxsize=1024)(self._scan)
+
+        # When the Azure check is enabled it runs on this pool while compliance runs
+        # in the calling thread. The pool is shared by every concurrent caller
+        # (Streamlit sessions, evaluation workers), so it is sized to match the
+        # shared HTTP connection pool and not to one caller's two checks
+        self._pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="governance")
+
+    def validate_input(self, text: str, audit: bool = True) -> Dict[str, Any]:
+        """
+        Validates user input before processing
+
+        audit=False skips the audit entry, for callers that cache the result
+        and record each use themselves with record_audit
+        """
+        pii_matches, injection_hits, keyword_flags = self._scan_cached(text)
+        # Lowercase once for every case-insensitive check downstream
+        text_lower = text.lower()
+        safety_args = dict(
+            injection_hits=list(injection_hits),
+            keyword_flags=None if keyword_flags is None else list(keyword_flags), text_lower=text_lower
+        )
+        # Only the Azure round-trip is worth a thread hop; purely local safety
+        # checks are faster inline than the handoff to a worker
+        f_safe = None
+        if self.safety_validator.coalescer:
+            f_safe = self._pool.submit(self.safety_validator.validate, text, **safety_args)
+        compliance_result = self.compliance_checker.check_compliance(
+            text, compliance_standards=["GDPR"],
+            pii_result=self.compliance_checker.pii_detector.build_result(pii_matches)
+        )
+        safety_result = (f_safe.result() if f_safe is not None
+                         else self.safety_validator.validate(text, **safety_args))
         passed = safety_result['safe'] and compliance_result['compliant']
         violations = safety_result['violations'] + compliance_result['violations']
+        now_ns = time.time_ns()
         result = {
             'passed': passed,
             'violations': violations,
-            'timestamp': datetime.datetime.now().isoformat()
+            'timestamp': _format_ns(now_ns)
         }
-        self._log_audit("validate_input", result)
+        if audit:
+            self._log_audit("validate_input", result, now_ns)
         return result
 
+    def record_audit(self, action: str, result: Dict[str, Any]):
+        """Records an audit entry for a check whose result was reused from a cache"""
+        self._log_audit(action, result)
+
     def validate_output(self, text: str) -> Dict[str, Any]:
         """
         Validates LLM output before returning to user.
@@ -41,28 +113,178 @@ class GovernanceGate:
         text_lower = text.lower()
         violations = []
         
-        strict_patterns = ['fuck', 'shit', 'bitch', 'racist', 'nazi', 'supremacist']
-        for word in strict_patterns:
+        for word in self.output_strict_patterns:
             if word in text_lower:
-                violations.append(f"Inappropriate language in response: {word}")
+                violations.append(('output_language', word))
 
         passed = len(violations) == 0
+        now_ns = time.time_ns()
         result = {
             'passed': passed,
             'violations': violations,
-            'timestamp': datetime.datetime.now().isoformat()
+            'timestamp': _format_ns(now_ns)
         }
-        self._log_audit("validate_output", result)
+        self._log_audit("validate_output", result, now_ns)
         return result
 
+    def output_stream_validator(self) -> "OutputStreamValidator":
+        """Returns an incremental validate_output for a response that is being streamed"""
+        return OutputStreamValidator(self)
+
+    def _scan(self, text: str) -> Tuple[Tuple[PIIEntity, ...], Tuple[str, ...], Tuple]:
+        """
+        Run the fused governance patterns over text once
+
+        Returns (pii_matches, injection_hits, keyword_flags): PII matches as
+        PIIEntity tuples, the injection patterns that hit, and the
+        ContentSafety flags for matched keywords (None when Hyperscan is not
+        available, leaving keyword matching to ContentSafety)
+        """
+        if self._hs_db is not None:
+            return self._scan_hyperscan(text)
+
+        pii_matches = []
+        injection_hits = []
+        for match in self._fused.finditer(text):
+            name = match.lastgroup
+            if name.startswith("pii_"):
+                pii_matches.append(PIIEntity(name[4:], match.group(), match.start(), match.end()))
+            else:
+                pattern = self._injection_names[name]
+                if pattern not in injection_hits:
+                    injection_hits.append(pattern)
+        return tuple(pii_matches), tuple(injection_hits), None
+
+    def _compile_hyperscan(self):
+        """Compiles injection patterns and safety keywords into one Hyperscan database"""
+        table = [('inj', p) for p in self.safety_validator.injection_patterns]
+        table += [('kw', flag) for flag in self.safety_validator.content_safety.keyword_flags()]
+        expressions = [p.encode() if kind == 'inj' else re.escape(p.text).encode() for kind, p in table]
+
+        db = hyperscan.Database()
+        db.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            # Case-insensitive, and report each pattern at most once per scan
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions)
+        )
+        return db, table
+
+    def _scan_hyperscan(self, text: str):
+        """Hyperscan variant of _scan: one database scan for literals, PIIDetector for PII spans"""
+        injection_hits = []
+        keyword_flags = []
+
+        def on_match(match_id, start, end, flags, context):
+            kind, value = self._hs_table[match_id]
+            (injection_hits if kind == 'inj' else keyword_flags).append(value)
+
+        scratch = getattr(self._hs_local, 'scratch', None)
+        if scratch is None:
+            scratch = self._hs_local.scratch = hyperscan.Scratch(self._hs_db)
+        # surrogatepass: a lone surrogate becomes bytes no pattern matches instead of an error
+        self._hs_db.scan(text.encode('utf-8', 'surrogatepass'), match_event_handler=on_match, scratch=scratch)
+
+        pii_matches = self.compliance_checker.pii_detector.detect(text)['entities']
+        return tuple(pii_matches), tuple(injection_hits), tuple(keyword_flags)
+
     def get_audit_log(self):
+        # Wait for the writer to catch up so callers see every entry logged so far
+        self._audit_queue.join()
+        # Entries store raw clock readings and violation tuples; ISO timestamps
+        # and violation messages are only formatted on dump
+        for entry in self.audit_log:
+            if 'timestamp' not in entry:
+                entry['timestamp'] = _format_ns(entry['ts_ns'])
+                entry['violations'] = format_violations(entry['details']['violations'])
         return self.audit_log
 
-    def _log_audit(self, action: str, result: Dict[str, Any]):
+    def _log_audit(self, action: str, result: Dict[str, Any], ts_ns: int = None):
         entry = {
             'action': action,
             'result': "PASS" if result['passed'] else "FAIL",
             'details': result,
-            'timestamp': datetime.datetime.now().isoformat()
+            'ts_ns': ts_ns if ts_ns is not None else time.time_ns(),
+            'mono_ns': time.monotonic_ns()
         }
-        self.audit_log.append(entry)
+        self._audit_queue.put(entry)
+
+    def _drain_audit_queue(self, batch_size: int = 100):
+        """Background worker: move queued audit entries into audit_log in batches"""
+        while True:
+            batch = [self._audit_queue.get()]
+            while len(batch) < batch_size:
+                try:
+                    batch.append(self._audit_queue.get_nowait())
+                except queue.Empty:
+                    break
+            self.audit_log.extend(batch)
+            for _ in batch:
+                self._audit_queue.task_done()
+
+
+_VIOLATION_MESSAGES = {
+    'unsafe_kw': "Unsafe Keyword ({}): {}",
+    'injection': "Prompt Injection Detected: {}",
+    'azure': "Azure Content Safety Violation: {} (severity: {})",
+    'output_language': "Inappropriate language in response: {}",
+}
+
+
+def format_violations(items) -> List[str]:
+    """
+    Turns violation tuples into display messages
+
+    Validators record violations as (kind, *fields) tuples so nothing is
+    formatted on the hot path; call this only where messages are shown
+    (audit log dump, UI, MLflow events)
+    """
+    messages = []
+    for kind, *fields in items:
+        if kind == 'pii':
+            shown = ", ".join(f"{entity.type}: {entity.text}" for entity in fields[0])
+            messages.append(f"PII Detected: {shown}...")
+        else:
+            messages.append(_VIOLATION_MESSAGES[kind].format(*fields))
+    return messages
+
+
+def _format_ns(ts_ns: int) -> str:
+    """Formats a time.time_ns() reading as a local ISO-8601 timestamp"""
+    return datetime.datetime.fromtimestamp(ts_ns / 1e9).isoformat()
+
+
+class OutputStreamValidator:
+    """
+    Applies validate_output's checks to a streamed response chunk by chunk,
+    so validation overlaps generation instead of waiting for the full text
+    """
+
+    def __init__(self, gate: GovernanceGate):
+        self.gate = gate
+        self.violations = []
+        # Keep enough of the previous text to catch a word split across chunks
+        self._overlap = max(len(word) for word in gate.output_strict_patterns) - 1
+        self._tail = ""
+
+    def feed(self, chunk: str) -> bool:
+        """Checks the new chunk (plus carried-over tail); returns False once a violation is seen"""
+        window = self._tail + chunk.lower()
+        for word in self.gate.output_strict_patterns:
+            violation = ('output_language', word)
+            if word in window and violation not in self.violations:
+                self.violations.append(violation)
+        self._tail = window[-self._overlap:]
+        return not self.violations
+
+    def finish(self) -> Dict[str, Any]:
+        """Builds the validate_output result for the streamed response and logs it"""
+        now_ns = time.time_ns()
+        result = {
+            'passed': not self.violations,
+            'violations': self.violations,
+            'timestamp': _format_ns(now_ns)
+        }
+        self.gate._log_audit("validate_output", result, now_ns)
+        return result
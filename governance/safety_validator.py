@@ -4,14 +4,20 @@ RUBRIC: Governance & Guardrails - Safety validator with Azure Content Safety (3
 
 TASK: Implement safety validation using both local checks and Azure Content Safety
 """
-import re
+import logging
+import threading
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from typing import Dict, Any, List
 from azure.ai.contentsafety import ContentSafetyClient
 from azure.core.credentials import AzureKeyCredential
-from azure.core.exceptions import HttpResponseError
-from azure.ai.contentsafety.models import AnalyzeTextOptions
+from azure.core.exceptions import AzureError
 from src.config import Config
+from src.http_transport import get_shared_transport
 from guardrails.content_safety import ContentSafety
+from guardrails.re_backend import compile_pattern
+from governance.content_safety_coalescer import ContentSafetyCoalescer
+
+logger = logging.getLogger(__name__)
 
 
 class SafetyValidator:
@@ -31,18 +37,55 @@ class SafetyValidator:
             r"jailbreak mode",
         ]
 
+        # One compiled alternation so validate() finds every injection hit in a
+        # single scan; patterns are lowercase and matched against lowercased
+        # text, so the regex engine does no case folding of its own
+        self._injection_names = {f"p{i}": p for i, p in enumerate(self.injection_patterns)}
+        self._injection_re = compile_pattern(
+            "|".join(f"(?P<{name}>{p.lower()})" for name, p in self._injection_names.items())
+        )
+
+        # Azure Content Safety client is built lazily on first use (see client)
+        # so constructing the validator stays off the startup critical path
+        self.endpoint = Config.AZURE_CONTENT_SAFETY_ENDPOINT
+        self.key = Config.AZURE_CONTENT_SAFETY_KEY
+        self._client = None
+        self._coalescer = None
+        self._client_ready = False
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """Azure Content Safety client, or None without credentials (built on first access)"""
+        if not self._client_ready:
+            with self._client_lock:
+                if not self._client_ready:
+                    self._init_client()
+                    self._client_ready = True
+        return self._client
+
+    @property
+    def coalescer(self):
+        """In-flight request deduplication around client, or None if the client is unavailable"""
+        return self._coalescer if self.client else None
+
+    def _init_client(self):
         # Initialize Azure Content Safety client if credentials available
-        self.client = None
-        if Config.AZURE_CONTENT_SAFETY_ENDPOINT and Config.AZURE_CONTENT_SAFETY_KEY:
+        if self.endpoint and self.key:
             try:
-                self.client = ContentSafetyClient(
-                    endpoint=Config.AZURE_CONTENT_SAFETY_ENDPOINT,
-                    credential=AzureKeyCredential(Config.AZURE_CONTENT_SAFETY_KEY)
+                self._client = ContentSafetyClient(
+                    endpoint=self.endpoint,
+                    credential=AzureKeyCredential(self.key),
+                    # Reuse pooled keep-alive connections across validations
+                    transport=get_shared_transport()
                 )
+                # Concurrent validations of the same text share one request
+                self._coalescer = ContentSafetyCoalescer(self._client)
             except Exception as e:
-                print(f"Warning: Failed to init Azure Content Safety: {e}")
+                logger.warning(f"Failed to init Azure Content Safety: {e}")
 
-    def validate(self, text: str, severity_threshold: str = "high") -> Dict[str, Any]:
+    def validate(self, text: str, severity_threshold: str = "high", injection_hits: List[str] = None,
+                 keyword_flags: List = None, text_lower: str = None) -> Dict[str, Any]:
         """
         Validates the text for safety violations
 
@@ -51,40 +94,48 @@ class SafetyValidator:
         2. Runs local content safety check
         3. Checks for prompt injection patterns
         4. Runs Azure Content Safety check if client available
-        5. Returns dict with safe, violations, severity
+        5. Returns dict with safe, violations (tuples, see format_violations), severity
+
+        injection_hits / keyword_flags may be passed in when the caller has
+        already matched the injection patterns / safety keywords (GovernanceGate
+        does this from its fused scan); text_lower lets the caller share one
+        text.lower() across all keyword and injection checks
         """
         violations = []
         is_safe = True
+        if text_lower is None:
+            text_lower = text.lower()
 
         # 1. Local Content Safety Guardrail (Keywords & Regex)
-        local_result = self.content_safety.check(text)
-        if not local_result['safe']:
+        if keyword_flags is None:
+            keyword_flags = self.content_safety.check(text, text_lower=text_lower)['flags']
+        for flag in keyword_flags:
             is_safe = False
-            for flag in local_result['flags']:
-                violations.append(f"Unsafe Keyword ({flag['category']}): {flag['text']}")
+            violations.append(('unsafe_kw', flag.category, flag.text))
 
         # 2. Specific Injection Checks
-        for pattern in self.injection_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                is_safe = False
-                violations.append(f"Prompt Injection Detected: {pattern}")
+        if injection_hits is None:
+            injection_hits = list(dict.fromkeys(
+                self._injection_names[m.lastgroup] for m in self._injection_re.finditer(text_lower)
+            ))
+        for pattern in injection_hits:
+            is_safe = False
+            violations.append(('injection', pattern))
 
         # 3. Azure Content Safety Check
-        if self.client:
+        if self.coalescer:
             try:
-                request = AnalyzeTextOptions(text=text)
-                response = self.client.analyze_text(request)
+                response = self.coalescer.analyze(text)
 
                 # Check categories_analysis for high severity flags (severity > 2)
                 if response.categories_analysis:
                     for analysis in response.categories_analysis:
                         if analysis.severity > 2:
                             is_safe = False
-                            violations.append(
-                                f"Azure Content Safety Violation: {analysis.category} (severity: {analysis.severity})")
+                            violations.append(('azure', analysis.category, analysis.severity))
 
-            except HttpResponseError as e:
-                print(f"Azure Content Safety check failed: {e}")
+            except (AzureError, FuturesTimeoutError) as e:
+                logger.warning(f"Azure Content Safety check failed: {e}")
 
         return {
             'safe': is_safe,
@@ -5,11 +5,26 @@ RUBRIC: Governance & Guardrails - Content safety checks (2 marks)
 TASK: Implement keyword-based content safety checking
 """
 
+import functools
 import logging
-from typing import Dict, List
+from collections import namedtuple
+from typing import Dict, List, Tuple
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 logger = logging.getLogger(__name__)
 
+# Severity levels shared by every flag (one string object each, reused for all flags)
+HIGH = 'high'
+MEDIUM = 'medium'
+LOW = 'low'
+
+# One matched keyword; a flag per keyword is built up front and reused for every hit
+SafetyFlag = namedtuple('SafetyFlag', 'category text severity')
+
 
 class ContentSafety:
     """Checks content for safety violations"""
@@ -27,53 +42,74 @@ class ContentSafety:
         self.travel_red_flags = ['fraud', 'fake booking', 'scam', 'steal', 'smuggle', 'illegal', 'counterfeit',
                                  'forged', 'fake passport', 'fake visa', 'bypass security', 'avoid customs']
 
-    def check(self, text: str) -> Dict:
+        # Severity per category
+        self.category_severity = {
+            'violence': HIGH,
+            'hate_speech': HIGH,
+            'profanity': MEDIUM,
+            'personal_attack': LOW,
+            'travel_violation': HIGH
+        }
+
+        # Build one Aho-Corasick automaton over all keywords so check() scans the text once
+        self._ac = None
+        self._kw_bytes = None
+        if ahocorasick is not None:
+            self._ac = ahocorasick.Automaton()
+            for flag in self.keyword_flags():
+                self._ac.add_word(flag.text, flag)
+            self._ac.make_automaton()
+        else:
+            # Fallback: pre-encoded keywords for C-level bytes.find over the encoded text
+            self._kw_bytes = [(flag, flag.text.encode('utf-8')) for flag in self.keyword_flags()]
+
+        # Keyword hits keyed by the lowercased text
+        self._scan_cached = functools.lru_cache(maxsize=1024)(self._scan)
+
+    def keyword_flags(self):
+        """Yield the SafetyFlag for every unsafe pattern and travel red flag"""
+        for category, keywords in self.unsafe_patterns.items():
+            for keyword in keywords:
+                yield SafetyFlag(category, keyword, self.category_severity[category])
+        for red_flag in self.travel_red_flags:
+            yield SafetyFlag('travel_violation', red_flag, self.category_severity['travel_violation'])
+
+    def check(self, text: str, text_lower: str = None) -> Dict:
         """
         Check text for safety violations
 
         This method:
-        1. Converts text to lowercase
-        2. Initializes empty flags list
-        3. Checks text against unsafe_patterns
-        4. Checks text against travel_red_flags
-        5. Returns dict with safe, flags, severity
+        1. Lowercases text (unless the caller already did and passes text_lower)
+        2. Looks up (or computes) the keyword hits for the lowercased text
+        3. Returns dict with safe, flags (SafetyFlag tuples), severity
         """
-        text_lower = text.lower()
-        flags = []
-
-        # Check general unsafe patterns
-        for category, keywords in self.unsafe_patterns.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    # Determine severity based on category
-                    if category in ['violence', 'hate_speech']:
-                        severity = 'high'
-                    elif category == 'profanity':
-                        severity = 'medium'
-                    else:  # personal_attack
-                        severity = 'low'
-
-                    flags.append({
-                        'category': category,
-                        'text': keyword,
-                        'severity': severity
-                    })
-
-        # Check travel-specific red flags
-        for red_flag in self.travel_red_flags:
-            if red_flag in text_lower:
-                flags.append({
-                    'category': 'travel_violation',
-                    'text': red_flag,
-                    'severity': 'high'
-                })
+        if text_lower is None:
+            text_lower = text.lower()
+        flags = list(self._scan_cached(text_lower))
 
         return {
             'safe': len(flags) == 0,
             'flags': flags,
-            'severity': 'high' if any(f['severity'] == 'high' for f in flags) else ('medium' if flags else 'low')
+            'severity': HIGH if any(f.severity == HIGH for f in flags) else (MEDIUM if flags else LOW)
         }
 
+    def _scan(self, text_lower: str) -> Tuple[SafetyFlag, ...]:
+        """
+        Find unsafe keywords in already-lowercased text
+
+        Scans the text once with the Aho-Corasick automaton (falls back to a
+        keyword loop if pyahocorasick is not installed) and returns a hashable
+        tuple of SafetyFlag, each keyword at most once
+        """
+        if self._ac is None:
+            # Keywords are ASCII, so a UTF-8 byte search finds exactly the same hits
+            # (surrogatepass: a lone surrogate becomes bytes no keyword matches)
+            text_bytes = text_lower.encode('utf-8', 'surrogatepass')
+            return tuple(flag for flag, kw_bytes in self._kw_bytes if text_bytes.find(kw_bytes) >= 0)
+
+        # Flags are stored on the automaton, so a hit needs no new allocation
+        return tuple(dict.fromkeys(flag for _, flag in self._ac.iter(text_lower)))
+
     def get_safety_score(self, text: str) -> float:
         """
         Calculate safety score (0-1)
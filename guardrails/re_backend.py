@@ -0,0 +1,55 @@
+"""
+Regex Backend
+Compiles guardrail patterns with RE2 (linear-time, no catastrophic
+backtracking) when google-re2 is installed, otherwise with the standard re
+"""
+import re
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+
+def compile_pattern(pattern: str):
+    """Compiled pattern exposing search / finditer / sub, backed by RE2 when available"""
+    if re2 is None:
+        return re.compile(pattern)
+    return _RE2Pattern(pattern)
+
+
+def _utf8_encodable(text: str) -> bool:
+    if text.isascii():
+        return True
+    try:
+        text.encode("utf-8")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+class _RE2Pattern:
+    """RE2 pattern that hands text RE2 cannot encode (lone surrogates) to re instead"""
+
+    __slots__ = ("pattern", "_re2", "_std")
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self._re2 = re2.compile(pattern)
+        self._std = None
+
+    def _engine(self, text: str):
+        if _utf8_encodable(text):
+            return self._re2
+        if self._std is None:
+            self._std = re.compile(self.pattern)
+        return self._std
+
+    def search(self, text: str):
+        return self._engine(text).search(text)
+
+    def finditer(self, text: str):
+        return self._engine(text).finditer(text)
+
+    def sub(self, repl, text: str):
+        return self._engine(text).sub(repl, text)
@@ -15,8 +15,10 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import streamlit as st
 from src.search_engine import TravelSearchEngine
+from governance.governance_gate import format_violations
 from src.config import Config
 import src.monitoring  # Enable MLflow/Azure Monitor
+import threading
 import time
 
 # Set page config with title and layout
@@ -37,27 +39,33 @@ def get_engine():
     Try to return TravelSearchEngine(), handle exceptions
     """
     try:
-        return TravelSearchEngine()
+        engine = TravelSearchEngine()
+        # Build the Azure Content Safety client in the background so the
+        # first query doesn't pay for client construction
+        threading.Thread(target=lambda: engine.governance_gate.safety_validator.client, daemon=True).start()
+        return engine
     except Exception as e:
         st.error(f"Failed to initialize search engine: {e}")
         return None
 
 
-def display_results(results, query_text, generated_response):
+def display_results(results, query_text, response_stream):
     """
     Display search results and AI response
 
     This function:
     1. Shows success message with result count
-    2. Displays AI response in container
+    2. Streams AI response into a placeholder as it is generated
     3. Shows source documents in expander
     """
     st.success(f"Found {len(results)} relevant documents.")
 
-    # Show AI Response
+    # Show AI Response (each item is the response so far, already validated)
     st.subheader("💬 AI Response")
     with st.container():
-        st.markdown(generated_response)
+        resp_container = st.empty()
+        for partial in response_stream:
+            resp_container.markdown(partial)
 
     # Show Sources
     if results:
@@ -72,12 +80,45 @@ def display_results(results, query_text, generated_response):
         st.warning("No source documents found.")
 
 
+@st.cache_data(ttl=3600, max_entries=8)
+def cached_validate_input(text: str):
+    """
+    Run input governance checks once per example question
+
+    Only the fixed EXAMPLE_QUERIES go through this cache (see validate_query),
+    so it never holds user-typed queries or the PII found in them
+    """
+    return engine.governance_gate.validate_input(text, audit=False)
+
+
+def validate_query(text: str):
+    """Input governance for a submitted query, with an audit entry for every use"""
+    if text not in EXAMPLE_QUERIES.values():
+        return engine.governance_gate.validate_input(text)
+    result = cached_validate_input(text)
+    engine.governance_gate.record_audit("validate_input", result)
+    return result
+
+
+# Example questions shown as buttons
+EXAMPLE_QUERIES = {
+    "✈️ Baggage Rules": "What are the baggage allowance rules for international flights?",
+    "📋 Visa Info": "Do I need a visa to travel from India to UK?",
+    "🎫 Cancellation Policy": "What is the cancellation policy for Air India flights?",
+}
+
 # Get engine instance
 engine = get_engine()
 
+# Warm the validation cache for the example questions
+if engine:
+    for example in EXAMPLE_QUERIES.values():
+        cached_validate_input(example)
+
 # Cache clear option (for debugging)
 if st.sidebar.button("🔄 Clear Cache"):
     st.cache_resource.clear()
+    st.cache_data.clear()
     st.rerun()
 
 # ====================
@@ -111,16 +152,10 @@ with st.sidebar:
 st.markdown("### 🔍 Ask Your Travel Questions")
 
 # Example questions in 3 columns
-col1, col2, col3 = st.columns(3)
-with col1:
-    if st.button("✈️ Baggage Rules"):
-        st.session_state.example_query = "What are the baggage allowance rules for international flights?"
-with col2:
-    if st.button("📋 Visa Info"):
-        st.session_state.example_query = "Do I need a visa to travel from India to UK?"
-with col3:
-    if st.button("🎫 Cancellation Policy"):
-        st.session_state.example_query = "What is the cancellation policy for Air India flights?"
+for col, (label, example) in zip(st.columns(3), EXAMPLE_QUERIES.items()):
+    with col:
+        if st.button(label):
+            st.session_state.example_query = example
 
 st.divider()
 
@@ -149,15 +184,17 @@ if search_button and engine and query_text:
 
         try:
             # Search for relevant documents
-            results, processed_query = engine.search_by_text(query_text, k=5)
+            gov_check = validate_query(query_text)
+            results, processed_query = engine.search_by_text(query_text, k=5, gov_check=gov_check)
 
-            # Generate AI response
-            generated_response = engine.synthesize_response(results, query_text)
+            if not gov_check['passed']:
+                st.error("🚫 Query blocked by security checks: " + "; ".join(format_violations(gov_check['violations'])))
 
             latency = time.time() - start_time
             st.info(f"✅ Search completed in {latency:.2f}s")
 
-            display_results(results, query_text, generated_response)
+            # Stream AI response; output validation runs on each chunk
+            display_results(results, query_text, engine.stream_response(results, query_text))
 
         except Exception as e:
             st.error(f"❌ Error: {str(e)}")
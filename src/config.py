@@ -8,6 +8,7 @@ RUBRIC: Environment Setup & Configuration (8 marks total)
 
 TASK: Load all configuration from environment variables
 """
+import logging
 import os
 from dotenv import load_dotenv
 
@@ -55,8 +56,36 @@ class Config:
     # ====================
     MLFLOW_TRACKING_URI = os.getenv("MLFLOW_TRACKING_URI")
     MLFLOW_EXPERIMENT_NAME = os.getenv("MLFLOW_EXPERIMENT_NAME", "wanderlust-travel-chatbot")
+    # Upload answered (query, response) pairs as batched JSONL artifacts (off by default)
+    MLFLOW_LOG_ARTIFACTS = os.getenv("MLFLOW_LOG_ARTIFACTS", "false").lower() in ("1", "true", "yes")
     
     # ====================
     # Ingestion Settings
     # ====================
-    INGESTION_LIMIT = int(os.getenv("INGESTION_LIMIT", "0"))
\ No newline at end of file
+    INGESTION_LIMIT = int(os.getenv("INGESTION_LIMIT", "0"))
+    # "pdfium" (pypdfium2, native and much faster) or "pypdf" (LangChain's PyPDFLoader)
+    PDF_LOADER = os.getenv("PDF_LOADER", "pdfium")
+    # Chunking, measured in tokens (cl100k_base): 512 tokens with ~10% overlap
+    CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "512"))
+    CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "50"))
+    # Per-document cap on retrieved text placed in the LLM prompt. Follows
+    # CHUNK_SIZE at 8 chars/token (above what English prose reaches; the bundled
+    # corpus peaks near 6) so a full chunk is never cut; lower it to trim context
+    MAX_CTX_CHARS_PER_DOC = int(os.getenv("MAX_CTX_CHARS_PER_DOC", str(CHUNK_SIZE * 8)))
+    # SQLite cache of chunk embeddings, so re-ingesting unchanged content is free (empty = disabled)
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "cache/emb.sqlite")
+
+    # ====================
+    # Logging
+    # ====================
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+
+# Configure the root logger once; modules log through logging.getLogger(__name__).
+# getLevelName maps a known level name to its number; anything else falls back to INFO
+_unknown_log_level = None
+if not isinstance(logging.getLevelName(Config.LOG_LEVEL), int):
+    _unknown_log_level, Config.LOG_LEVEL = Config.LOG_LEVEL, "INFO"
+logging.basicConfig(level=Config.LOG_LEVEL)
+if _unknown_log_level is not None:
+    logging.getLogger(__name__).warning(f"Unknown LOG_LEVEL {_unknown_log_level!r}, using INFO")
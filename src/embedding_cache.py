@@ -0,0 +1,166 @@
+"""
+Embedding Cache
+Content-addressed disk cache in front of an Embeddings client, so unchanged
+chunks are not re-embedded on every ingestion run
+"""
+import atexit
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from cachetools import LRUCache
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# SQLite caps the number of bound parameters per statement
+_SQL_BATCH = 500
+
+# Query vectors are keyed apart from document vectors of the same text
+_QUERY_PREFIX = "query"
+
+
+class CachedEmbeddings(Embeddings):
+    """Wraps an Embeddings client with a SQLite cache keyed by a hash of the text"""
+
+    def __init__(self, base: Embeddings, path: str, namespace: str = "", query_cache_size: int = 4096):
+        self.base = base
+        self.path = Path(path)
+        # Part of every key, so switching embedding models never serves stale vectors
+        self.namespace = namespace
+
+        # Connection is opened on first use; one connection shared by all threads
+        self._conn = None
+        self._lock = threading.Lock()
+
+        # Query vectors live in memory as float32 (6 KiB per 1536-dim vector);
+        # the query table is read once on first use and rewritten at exit, so
+        # after that first read searches never touch the disk
+        self._query_cache = LRUCache(maxsize=query_cache_size)
+        self._query_lock = threading.Lock()
+        self._queries_loaded = False
+        self._queries_dirty = False
+        atexit.register(self.save_queries)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts, sending only cache misses to the base client
+
+        If the cache file can't be read or written (locked by another process,
+        unwritable directory), texts are embedded by the base client uncached
+        """
+        keys = [self._key(text) for text in texts]
+        cached = self._lookup(set(keys))
+
+        # Identical texts within one call are embedded once
+        misses = {key: text for key, text in zip(keys, texts) if key not in cached}
+        if misses:
+            vectors = self.base.embed_documents(list(misses.values()))
+            fresh = dict(zip(misses, vectors))
+            self._store(fresh)
+            cached.update(fresh)
+
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a search query, reusing vectors for repeated queries (memory only on the request path)"""
+        key = self._key(text, prefix=_QUERY_PREFIX)
+        with self._query_lock:
+            if not self._queries_loaded:
+                self._load_queries()
+            vec = self._query_cache.get(key)
+        if vec is not None:
+            return vec.tolist()
+
+        result = self.base.embed_query(text)
+        with self._query_lock:
+            self._query_cache[key] = np.asarray(result, dtype=np.float32)
+            self._queries_dirty = True
+        return result
+
+    def save_queries(self):
+        """Replace the on-disk query table with the in-memory query vectors (runs at exit)"""
+        with self._query_lock:
+            if not self._queries_dirty:
+                return
+            rows = [(key, sqlite3.Binary(vec.tobytes())) for key, vec in self._query_cache.items()]
+            self._queries_dirty = False
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute("DELETE FROM queries")
+                    conn.executemany("INSERT INTO queries (key, vec) VALUES (?, ?)", rows)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Failed to save query embeddings: {e}")
+
+    def _load_queries(self):
+        # Warm restart: one read of the saved query vectors, bounded by the LRU size.
+        # On failure queries are served from memory and the base client, and the
+        # load is tried again on the next query
+        try:
+            with self._lock:
+                rows = self._connect().execute(
+                    "SELECT key, vec FROM queries LIMIT ?", (self._query_cache.maxsize,)
+                ).fetchall()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Failed to load saved query embeddings: {e}")
+            return
+        for key, blob in rows:
+            self._query_cache[key] = np.frombuffer(blob, dtype=np.float32)
+        self._queries_loaded = True
+
+    def _key(self, text: str, prefix: str = "") -> str:
+        # BLAKE2b: collision-safe for content addressing and faster than SHA-256
+        scope = f"{prefix}\0{self.namespace}" if prefix else self.namespace
+        return hashlib.blake2b(f"{scope}\0{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            try:
+                conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, vec BLOB NOT NULL)")
+                conn.execute("CREATE TABLE IF NOT EXISTS queries (key TEXT PRIMARY KEY, vec BLOB NOT NULL)")
+            except sqlite3.Error:
+                conn.close()
+                raise
+            # Only a fully set-up connection is kept, so a failed open is retried next time
+            self._conn = conn
+        return self._conn
+
+    def _lookup(self, keys) -> dict:
+        keys = list(keys)
+        found = {}
+        try:
+            with self._lock:
+                conn = self._connect()
+                for i in range(0, len(keys), _SQL_BATCH):
+                    part = keys[i:i + _SQL_BATCH]
+                    rows = conn.execute(
+                        f"SELECT key, vec FROM cache WHERE key IN ({','.join('?' * len(part))})", part
+                    )
+                    for key, blob in rows:
+                        found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        except (sqlite3.Error, OSError) as e:
+            # Treat everything as a miss; the base client still embeds the batch
+            logger.warning(f"Embedding cache read failed, embedding without it: {e}")
+            return {}
+        return found
+
+    def _store(self, vectors: dict):
+        rows = [
+            (key, sqlite3.Binary(np.asarray(vec, dtype=np.float32).tobytes()))
+            for key, vec in vectors.items()
+        ]
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO cache (key, vec) VALUES (?, ?)", rows)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Embedding cache write failed, vectors not cached: {e}")
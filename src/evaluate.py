@@ -9,9 +9,9 @@ RUBRIC: Evaluation Framework (RAGAS) (8 marks total)
 TASK: Implement Ragas evaluation with 4 metrics
 """
 import os
-import json
 import logging
 import asyncio
+import orjson
 import pandas as pd
 from pathlib import Path
 from typing import List, Dict
@@ -47,8 +47,7 @@ class TravelChatbotEvaluator:
             logger.info("Creating sample golden dataset...")
             return self._create_sample_dataset()
 
-        with open(self.golden_dataset_path, 'r') as f:
-            return json.load(f)
+        return orjson.loads(self.golden_dataset_path.read_bytes())
 
     def _create_sample_dataset(self) -> List[Dict]:
         """
@@ -82,13 +81,12 @@ class TravelChatbotEvaluator:
 
         # Save sample dataset
         self.golden_dataset_path.parent.mkdir(exist_ok=True)
-        with open(self.golden_dataset_path, 'w') as f:
-            json.dump(sample_data, f, indent=2)
+        self.golden_dataset_path.write_bytes(orjson.dumps(sample_data, option=orjson.OPT_INDENT_2))
 
         logger.info(f"Sample golden dataset saved to {self.golden_dataset_path}")
         return sample_data
 
-    def generate_responses(self, questions: List[str]) -> tuple:
+    async def generate_responses(self, questions: List[str], max_concurrency: int = 8) -> tuple:
         """
         Generate responses for questions
 
@@ -96,32 +94,32 @@ class TravelChatbotEvaluator:
         1. Searches for documents
         2. Synthesizes response
         3. Collects contexts
-        Returns (answers, contexts)
+        Questions are answered concurrently (at most max_concurrency in flight)
+        Returns (answers, contexts), in question order
         """
-        answers = []
-        contexts = []
+        semaphore = asyncio.Semaphore(max_concurrency)
 
-        for question in questions:
-            logger.info(f"Generating answer for: {question}")
+        async def answer_one(question: str):
+            async with semaphore:
+                logger.info(f"Generating answer for: {question}")
 
-            try:
-                # Search for relevant documents
-                docs, _ = self.engine.search_by_text(question, k=5)
+                try:
+                    # Search for relevant documents
+                    docs, _ = await self.engine.asearch_by_text(question, k=5)
 
-                # Generate answer
-                answer = self.engine.synthesize_response(docs, question)
+                    # Generate answer
+                    answer = await self.engine.asynthesize_response(docs, question)
 
-                # Collect contexts (retrieved documents)
-                context_texts = [doc.page_content for doc in docs]
+                    # Collect contexts (retrieved documents)
+                    return answer, [doc.page_content for doc in docs]
 
-                answers.append(answer)
-                contexts.append(context_texts)
-
-            except Exception as e:
-                logger.error(f"Error generating answer for '{question}': {e}")
-                answers.append("Unable to generate answer")
-                contexts.append([])
+                except Exception as e:
+                    logger.error(f"Error generating answer for '{question}': {e}")
+                    return "Unable to generate answer", []
 
+        results = await asyncio.gather(*(answer_one(q) for q in questions))
+        answers = [answer for answer, _ in results]
+        contexts = [context for _, context in results]
         return answers, contexts
 
     async def run_ragas_evaluation(self):
@@ -154,7 +152,7 @@ class TravelChatbotEvaluator:
 
         # Generate answers and contexts
         logger.info("\nGenerating responses...")
-        answers, contexts = self.generate_responses(questions)
+        answers, contexts = await self.generate_responses(questions)
 
         # Prepare dataset for Ragas
         dataset_dict = {
@@ -221,8 +219,7 @@ class TravelChatbotEvaluator:
         }
 
         summary_path = output_dir / "evaluation_summary.json"
-        with open(summary_path, 'w') as f:
-            json.dump(summary, f, indent=2)
+        summary_path.write_bytes(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
 
         logger.info(f"\n✅ Evaluation summary saved to {summary_path}")
 
@@ -235,9 +232,7 @@ class TravelChatbotEvaluator:
 
     def run(self):
         """Run evaluation (sync wrapper)"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        return loop.run_until_complete(self.run_ragas_evaluation())
+        return asyncio.run(self.run_ragas_evaluation())
 
 
 def run_evaluation():
@@ -0,0 +1,22 @@
+"""
+Shared HTTP transport for Azure SDK clients
+One keep-alive connection pool reused by every sync Azure client, so
+back-to-back calls skip the TCP/TLS handshake
+"""
+import functools
+
+import requests
+from requests.adapters import HTTPAdapter
+from azure.core.pipeline.transport import RequestsTransport
+
+
+@functools.lru_cache(maxsize=None)
+def get_shared_transport(pool_maxsize: int = 32) -> RequestsTransport:
+    """Process-wide RequestsTransport over a single pooled requests.Session"""
+    session = requests.Session()
+    # Enough pooled connections for the concurrent Content Safety calls
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # session_owner=False: clients must not close the shared session when they close
+    return RequestsTransport(session=session, session_owner=False)
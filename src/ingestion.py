@@ -8,10 +8,13 @@ RUBRIC: Document Ingestion Pipeline (8 marks total)
 
 TASK: Ingest and index documents to Azure AI Search
 """
+import hashlib
+import itertools
 import os
-import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 from tqdm import tqdm
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
 
 from src.search_engine import TravelSearchEngine
 from src.data_loader import TravelDataLoader
@@ -20,15 +23,62 @@ from src.config import Config
 import mlflow
 
 
+def _is_rate_limited(exc: BaseException) -> bool:
+    # Azure Search (HttpResponseError) and Azure OpenAI (RateLimitError) both expose status_code
+    return getattr(exc, "status_code", None) == 429
+
+
+@retry(
+    retry=retry_if_exception(_is_rate_limited),
+    wait=wait_exponential_jitter(initial=1, max=30),
+    stop=stop_after_attempt(6),
+    reraise=True
+)
+def _index_batch(engine, batch) -> int:
+    """
+    Index one batch, backing off with jitter whenever the service throttles (HTTP 429)
+
+    The whole batch is embedded in a single embed_documents request and the
+    vectors are pushed with add_embeddings
+    """
+    texts = [chunk.page_content for chunk in batch]
+    vectors = engine.embeddings.embed_documents(texts)
+    engine.vector_store.add_embeddings(
+        text_embeddings=zip(texts, vectors),
+        metadatas=[chunk.metadata for chunk in batch]
+    )
+    return len(batch)
+
+
+def _unique_chunks(chunks, stats: dict):
+    """
+    Drop chunks whose text was already seen in this run (first occurrence wins)
+
+    Repeated boilerplate (headers, disclaimers) would otherwise cost an
+    embedding, index storage and a duplicate retrieval neighbour.
+    stats['seen'] / stats['duplicates'] are updated as the stream is consumed.
+    """
+    seen = set()
+    for chunk in chunks:
+        stats['seen'] += 1
+        digest = hashlib.blake2b(chunk.page_content.encode("utf-8"), digest_size=16).digest()
+        if digest in seen:
+            stats['duplicates'] += 1
+            continue
+        seen.add(digest)
+        yield chunk
+
+
 def ingest_travel_documents():
     """
     Ingests travel documents into Azure AI Search vector store
 
     This function:
     1. Initializes data loader and search engine
-    2. Loads all documents
-    3. Splits into chunks
-    4. Batch indexes to Azure Search (batch_size=50)
+    2. Streams documents from the loader
+    3. Splits them into chunks as they arrive, dropping duplicate chunk texts
+    4. Batch indexes to Azure Search (batch_size=50) from a thread pool, with a
+       bounded number of batches in flight and backoff on throttling
     5. Verifies with test query
     """
     print("\n🚀 Starting Travel Document Ingestion")
@@ -56,55 +106,71 @@ def ingest_travel_documents():
             print(f"⚠️  MLflow disabled: {e}")
 
     try:
-        # Load documents
-        documents = loader.load_all_travel_documents()
-
-        if not documents:
+        # Stream documents and chunks: nothing beyond the current batch is kept in memory
+        print("\n📂 Streaming travel knowledge base...")
+        dedup_stats = {'seen': 0, 'duplicates': 0}
+        chunks = _unique_chunks(loader.split_documents_stream(loader.iter_all_travel_documents()), dedup_stats)
+
+        # Peek at the first chunk so an empty data directory is reported up front
+        first_chunk = next(chunks, None)
+        if first_chunk is None:
             print("\n⚠️  No documents found in data directory")
             print("\nExpected structure:")
             print("  data/")
             print("    ├── *.pdf   (policies, FAQs, rules)")
             print("    └── *.csv   (routes or tabular data)")
             return
-
-        # Split into chunks
-        chunks = loader.split_documents(documents)
-
-        print(f"\n📊 Ingestion Summary:")
-        print(f"   Total chunks to index: {len(chunks)}")
+        chunks = itertools.chain([first_chunk], chunks)
 
         if mlflow_active:
-            mlflow.log_param("total_chunks", len(chunks))
-            mlflow.log_param("chunk_size", loader.text_splitter._chunk_size)
-            mlflow.log_param("chunk_overlap", loader.text_splitter._chunk_overlap)
+            mlflow.log_params({"chunk_size": loader.chunk_size, "chunk_overlap": loader.chunk_overlap})
 
         # ====================
         # Batch Ingestion
         # ====================
         print("\n📥 Indexing documents to Azure AI Search...")
         batch_size = 50
-        total_batches = (len(chunks) + batch_size - 1) // batch_size
+
+        max_workers = 8
 
         ingested_count = 0
         failed_count = 0
+        total_chunks = 0
+
+        # Index batches concurrently: the calls are network-bound, so threads
+        # overlap the round-trips. At most 2 * max_workers batches are pending,
+        # so the chunk stream is never read far ahead of indexing.
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as ex, \
+                tqdm(desc="Indexing", unit="batch") as progress:
+            for batch_num in itertools.count(1):
+                # Pull chunks from the stream in batches (total is unknown until the end)
+                batch = list(itertools.islice(chunks, batch_size))
+                if batch:
+                    total_chunks += len(batch)
+                    in_flight[ex.submit(_index_batch, engine, batch)] = (batch_num, len(batch))
+                    if len(in_flight) < 2 * max_workers:
+                        continue
+                elif not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    num, size = in_flight.pop(future)
+                    try:
+                        ingested_count += future.result()
+                    except Exception as e:
+                        tqdm.write(f"\n❌ Error indexing batch {num}: {e}")
+                        failed_count += size
+                    progress.update()
 
-        # Loop through chunks in batches
-        for i in tqdm(
-                range(0, len(chunks), batch_size),
-                desc="Indexing",
-                total=total_batches
-        ):
-            batch = chunks[i:i + batch_size]
-
-            try:
-                # Add documents to vector store
-                engine.vector_store.add_documents(batch)
-                ingested_count += len(batch)
-                time.sleep(0.5)  # avoid rate limits
+        print(f"\n📊 Ingestion Summary:")
+        print(f"   Total chunks processed: {total_chunks}")
+        print(f"   Duplicate chunks skipped: {dedup_stats['duplicates']} of {dedup_stats['seen']}")
 
-            except Exception as e:
-                print(f"\n❌ Error indexing batch {i // batch_size + 1}: {e}")
-                failed_count += len(batch)
+        if mlflow_active:
+            mlflow.log_param("total_chunks", total_chunks)
+            mlflow.log_metric("dedup_ratio", dedup_stats['duplicates'] / max(dedup_stats['seen'], 1))
 
         print(f"\n✅ Ingestion Complete!")
         print(f"   Successfully indexed: {ingested_count} chunks")
@@ -112,8 +178,7 @@ def ingest_travel_documents():
             print(f"   Failed: {failed_count} chunks")
 
         if mlflow_active:
-            mlflow.log_metric("ingested_count", ingested_count)
-            mlflow.log_metric("failed_count", failed_count)
+            mlflow.log_metrics({"ingested_count": ingested_count, "failed_count": failed_count})
 
         # ====================
         # Verification
@@ -0,0 +1,100 @@
+"""
+Response Logger
+Batches (query, response) pairs into periodic MLflow JSONL artifacts so
+artifact uploads never sit on the request path
+"""
+import atexit
+import datetime
+import functools
+import logging
+import queue
+import threading
+import time
+
+import orjson
+from mlflow import MlflowClient
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseLogger:
+    """Queues responses and uploads them in batches from a background thread"""
+
+    def __init__(self, experiment_name: str, batch_size: int = 100, flush_interval: float = 60.0):
+        self.experiment_name = experiment_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        # The run is created on the first upload; every batch becomes one artifact in it
+        self._client = MlflowClient()
+        self._run_id = None
+
+        # Bounded queue: if uploads fall behind, responses are dropped, not the request slowed
+        self._queue = queue.Queue(maxsize=10000)
+        self._worker = threading.Thread(target=self._drain, name="mlflow-response-logger", daemon=True)
+        self._worker.start()
+        atexit.register(self.flush)
+
+    def log(self, query: str, response: str):
+        """Record one answered query; never blocks the caller"""
+        try:
+            self._queue.put_nowait({'ts_ns': time.time_ns(), 'query': query, 'response': response})
+        except queue.Full:
+            pass
+
+    def flush(self, timeout: float = 10.0):
+        """Upload everything queued so far (including the batch being collected)"""
+        # Markers travel through the same queue, so every earlier entry is in the flushed batch
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+
+    def _drain(self):
+        """Background worker: upload a batch when it is full, flush_interval has passed, or flush() asks"""
+        while True:
+            batch = []
+            deadline = None
+            flushed = None
+            while len(batch) < self.batch_size:
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if isinstance(item, threading.Event):
+                    flushed = item
+                    break
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+
+            self._upload(batch)
+            if flushed is not None:
+                flushed.set()
+
+    def _upload(self, batch):
+        if not batch:
+            return
+        lines = b"\n".join(orjson.dumps(entry) for entry in batch).decode("utf-8")
+        stamp = datetime.datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        try:
+            # Only the worker thread uploads, so the run needs no lock
+            if self._run_id is None:
+                experiment = self._client.get_experiment_by_name(self.experiment_name)
+                experiment_id = (experiment.experiment_id if experiment
+                                 else self._client.create_experiment(self.experiment_name))
+                self._run_id = self._client.create_run(experiment_id, run_name="response_log").info.run_id
+            self._client.log_text(self._run_id, lines, f"responses/responses_{stamp}.jsonl")
+        except Exception as e:
+            logger.warning(f"Failed to log responses to MLflow: {e}")
+
+
+@functools.lru_cache(maxsize=None)
+def get_response_logger(experiment_name: str) -> ResponseLogger:
+    """Process-wide ResponseLogger for an experiment (one worker thread and run)"""
+    return ResponseLogger(experiment_name)
@@ -8,11 +8,69 @@ RUBRIC: Search Engine Implementation (13 marks total)
 
 TASK: Implement RAG search engine with governance integration
 """
+import asyncio
+import contextlib
+import functools
+import io
+import logging
+import threading
+
 import mlflow
+from cachetools import TTLCache
 from langchain_openai import AzureChatOpenAI, AzureOpenAIEmbeddings
 from src.config import Config
-from governance.governance_gate import GovernanceGate
+from governance.governance_gate import GovernanceGate, format_violations
 from src.vector_store import get_vector_store
+from src.embedding_cache import CachedEmbeddings
+from src.response_logger import get_response_logger
+
+logger = logging.getLogger(__name__)
+
+NO_DOCS_RESPONSE = "I couldn't find relevant information to answer your question. Please try rephrasing or contact our support team."
+BLOCKED_RESPONSE = "I generated a response but it didn't pass safety checks. Please rephrase your question."
+
+
+def get_llm() -> AzureChatOpenAI:
+    """Shared Azure Chat OpenAI client for the current configuration"""
+    return _build_llm(
+        Config.AZURE_OPENAI_API_KEY, Config.AZURE_OPENAI_ENDPOINT,
+        Config.AZURE_OPENAI_API_VERSION, Config.AZURE_OPENAI_DEPLOYMENT_NAME
+    )
+
+
+def get_embeddings():
+    """Shared Azure OpenAI Embeddings client (behind the embedding cache, if enabled)"""
+    return _build_embeddings(
+        Config.AZURE_OPENAI_API_KEY, Config.AZURE_OPENAI_ENDPOINT, Config.AZURE_OPENAI_API_VERSION,
+        Config.AZURE_OPENAI_EMBEDDING_DEPLOYMENT, Config.EMBEDDING_CACHE_PATH
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _build_llm(api_key, endpoint, api_version, deployment):
+    # Initialize Azure Chat OpenAI LLM
+    return AzureChatOpenAI(
+        api_key=api_key,
+        azure_endpoint=endpoint,
+        api_version=api_version,
+        deployment_name=deployment,
+        temperature=1
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _build_embeddings(api_key, endpoint, api_version, deployment, cache_path):
+    # Initialize Azure OpenAI Embeddings
+    embeddings = AzureOpenAIEmbeddings(
+        api_key=api_key,
+        azure_endpoint=endpoint,
+        azure_deployment=deployment,
+        api_version=api_version,
+    )
+    # Serve unchanged chunks from the local embedding cache
+    if cache_path:
+        embeddings = CachedEmbeddings(embeddings, cache_path, namespace=deployment)
+    return embeddings
 
 
 class TravelSearchEngine:
@@ -31,94 +89,225 @@ class TravelSearchEngine:
         # Initialize governance gate
         self.governance_gate = GovernanceGate()
 
-        # Initialize Azure Chat OpenAI LLM
-        self.llm = AzureChatOpenAI(
-            api_key=Config.AZURE_OPENAI_API_KEY,
-            azure_endpoint=Config.AZURE_OPENAI_ENDPOINT,
-            api_version=Config.AZURE_OPENAI_API_VERSION,
-            deployment_name=Config.AZURE_OPENAI_DEPLOYMENT_NAME,
-            temperature=1
-        )
-
-        # Initialize Azure OpenAI Embeddings
-        self.embeddings = AzureOpenAIEmbeddings(
-            api_key=Config.AZURE_OPENAI_API_KEY,
-            azure_endpoint=Config.AZURE_OPENAI_ENDPOINT,
-            azure_deployment=Config.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
-            api_version=Config.AZURE_OPENAI_API_VERSION,
-        )
+        # Azure Chat OpenAI LLM and Embeddings are process-wide clients shared
+        # by every engine (app, ingestion, evaluation), with their connection pools
+        self.llm = get_llm()
+        self.embeddings = get_embeddings()
 
         # Initialize Vector Store using get_vector_store function
         self.vector_store = get_vector_store(self.embeddings)
 
-    def search_by_text(self, query_text: str, k: int = 5):
+        # Retrieval results per (normalized query, k): repeat questions skip
+        # the embedding call and the Azure Search round-trip
+        self._search_cache = TTLCache(maxsize=1024, ttl=3600)
+        self._cache_lock = threading.Lock()
+
+        # MLflow tracking only when a tracking server is configured; the
+        # experiment is set once here rather than on every query
+        self._mlflow_enabled = bool(Config.MLFLOW_TRACKING_URI)
+        if self._mlflow_enabled:
+            try:
+                mlflow.set_experiment(Config.MLFLOW_EXPERIMENT_NAME)
+            except Exception as e:
+                logger.warning(f"MLflow disabled: {e}")
+                self._mlflow_enabled = False
+
+        # Responses are uploaded in batches off the request path, and only on request
+        self._response_logger = None
+        if self._mlflow_enabled and Config.MLFLOW_LOG_ARTIFACTS:
+            self._response_logger = get_response_logger(Config.MLFLOW_EXPERIMENT_NAME)
+
+    def search_by_text(self, query_text: str, k: int = 5, gov_check=None):
         """
         Search for travel information using a text query
 
         This method:
-        1. Sets MLflow experiment
-        2. Starts MLflow run
-        3. Validates input with governance gate
-        4. Performs similarity search on vector store
-        5. Logs metrics to MLflow
-        6. Returns results and query
+        1. Starts MLflow run (if MLflow is enabled)
+        2. Validates input with governance gate (unless the caller passes an
+           already computed validate_input result as gov_check)
+        3. Performs similarity search on vector store (or reuses a cached
+           result for the same normalized query and k)
+        4. Logs metrics to MLflow
+        5. Returns results and query
+
+        The cache is consulted only after governance: validation is
+        case-sensitive (e.g. passport numbers), so it always sees the raw query.
         """
 
-        # Set MLflow experiment name from Config
-        mlflow.set_experiment(Config.MLFLOW_EXPERIMENT_NAME)
-
-        with mlflow.start_run(run_name="search_travel_info"):
-            print(f"DEBUG: Text Query: {query_text}")
+        with self._mlflow_run("search_travel_info"):
+            logger.debug(f"Text query: {query_text}")
 
             # Validate input using governance gate
-            gov_check = self.governance_gate.validate_input(query_text)
+            if gov_check is None:
+                gov_check = self.governance_gate.validate_input(query_text)
 
             if not gov_check['passed']:
                 # Log governance failure event
-                mlflow.log_event("GovernanceCheckFailed", {"violations": gov_check['violations']})
+                if self._mlflow_enabled:
+                    mlflow.log_event("GovernanceCheckFailed", {"violations": format_violations(gov_check['violations'])})
                 return [], "Query blocked by security checks."
 
             # Log parameters to MLflow
-            mlflow.log_param("k", k)
-            mlflow.log_param("query_text", query_text)
+            if self._mlflow_enabled:
+                mlflow.log_params({"k": k, "query_text": query_text})
 
             # Perform similarity search on vector store
-            docs = self.vector_store.similarity_search(query_text, k=k)
+            cache_key = self._search_key(query_text, k)
+            docs = self._cached_docs(cache_key)
+            if docs is None:
+                docs = self.vector_store.similarity_search(query_text, k=k)
+                self._cache_docs(cache_key, docs)
 
             # Log metric for number of results
-            mlflow.log_metric("results_count", len(docs))
+            if self._mlflow_enabled:
+                mlflow.log_metric("results_count", len(docs))
 
             return docs, query_text
 
-    def synthesize_response(self, docs, user_query):
+    def synthesize_response(self, docs, user_query, stream: bool = False):
         """
         Generate a conversational response based on retrieved documents
 
         This method:
-        1. Starts MLflow run
+        1. Starts MLflow run (if MLflow is enabled)
         2. Builds context from retrieved documents
         3. Creates a prompt for the LLM
         4. Generates response using LLM
         5. Validates output with governance gate
-        6. Logs response to MLflow
+        6. Queues response for batched MLflow logging (if MLFLOW_LOG_ARTIFACTS)
         7. Returns final response
-        """
 
-        mlflow.set_experiment(Config.MLFLOW_EXPERIMENT_NAME)
+        With stream=True, returns the stream_response generator instead, so
+        the caller gets text as soon as the first tokens arrive; the blocking
+        invoke path is kept for callers that only need the final answer
+        """
+        if stream:
+            return self.stream_response(docs, user_query)
 
-        with mlflow.start_run(run_name="synthesize_response"):
+        with self._mlflow_run("synthesize_response"):
             # Handle case when no documents found
             if not docs:
-                return "I couldn't find relevant information to answer your question. Please try rephrasing or contact our support team."
+                return NO_DOCS_RESPONSE
+
+            # Build prompt for LLM from retrieved documents
+            prompt = self._build_prompt(docs, user_query)
 
-            # Build context from documents
-            context = "\n".join([
-                f"- {doc.page_content} (Source: {doc.metadata.get('source', 'Unknown')})"
-                for doc in docs
-            ])
+            # Generate response using LLM
+            response = self.llm.invoke(prompt).content
+
+            # Validate output using governance gate
+            gov_check = self.governance_gate.validate_output(response)
 
-            # Create prompt for LLM
-            prompt = f"""
+            if not gov_check['passed']:
+                return BLOCKED_RESPONSE
+
+            # Queue response for the batched MLflow artifact
+            if self._response_logger:
+                self._response_logger.log(user_query, response)
+
+            return response
+
+    def stream_response(self, docs, user_query):
+        """
+        Stream a conversational response based on retrieved documents
+
+        Same as synthesize_response, but tokens are streamed from the LLM and
+        output validation runs incrementally on each chunk. Yields the response
+        text so far after every chunk; if validation fails, the last value
+        yielded is the blocked-response message instead.
+        """
+
+        with self._mlflow_run("synthesize_response"):
+            if not docs:
+                yield NO_DOCS_RESPONSE
+                return
+
+            prompt = self._build_prompt(docs, user_query)
+            validator = self.governance_gate.output_stream_validator()
+
+            response = ""
+            for piece in self.llm.stream(prompt):
+                if not piece.content:
+                    continue
+                response += piece.content
+                if not validator.feed(piece.content):
+                    break
+                yield response
+
+            if not validator.finish()['passed']:
+                yield BLOCKED_RESPONSE
+                return
+
+            if self._response_logger:
+                self._response_logger.log(user_query, response)
+
+    async def asearch_by_text(self, query_text: str, k: int = 5, gov_check=None):
+        """
+        Async counterpart of search_by_text for concurrent callers (evaluation)
+
+        Governance runs in a worker thread and the vector search uses the
+        store's async client, so many queries can be in flight at once.
+        No per-query MLflow run is opened: the fluent run stack can't be
+        shared by interleaved coroutines.
+        """
+        if gov_check is None:
+            gov_check = await asyncio.to_thread(self.governance_gate.validate_input, query_text)
+
+        if not gov_check['passed']:
+            return [], "Query blocked by security checks."
+
+        cache_key = self._search_key(query_text, k)
+        docs = self._cached_docs(cache_key)
+        if docs is None:
+            docs = await self.vector_store.asimilarity_search(query_text, k=k)
+            self._cache_docs(cache_key, docs)
+        return docs, query_text
+
+    async def asynthesize_response(self, docs, user_query):
+        """Async counterpart of synthesize_response (same validation, no per-query MLflow run)"""
+        if not docs:
+            return NO_DOCS_RESPONSE
+
+        prompt = self._build_prompt(docs, user_query)
+        response = (await self.llm.ainvoke(prompt)).content
+
+        gov_check = self.governance_gate.validate_output(response)
+        if not gov_check['passed']:
+            return BLOCKED_RESPONSE
+
+        return response
+
+    @staticmethod
+    def _search_key(query_text: str, k: int):
+        # Case and whitespace differences don't change what the user is asking
+        return " ".join(query_text.lower().split()), k
+
+    def _cached_docs(self, cache_key):
+        with self._cache_lock:
+            docs = self._search_cache.get(cache_key)
+        # Hand out a copy so callers can't mutate the cached list
+        return None if docs is None else list(docs)
+
+    def _cache_docs(self, cache_key, docs):
+        with self._cache_lock:
+            self._search_cache[cache_key] = list(docs)
+
+    def _mlflow_run(self, run_name: str):
+        """MLflow run context (nested under any active run), or a no-op when MLflow is disabled"""
+        if not self._mlflow_enabled:
+            return contextlib.nullcontext()
+        return mlflow.start_run(run_name=run_name, nested=True)
+
+    def _build_prompt(self, docs, user_query):
+        """Builds the LLM prompt with the retrieved documents as context"""
+        max_chars = Config.MAX_CTX_CHARS_PER_DOC
+        buf = io.StringIO()
+        for doc in docs:
+            # Cap each document so k results stay within a bounded prompt size
+            buf.write(f"- {doc.page_content[:max_chars]} (Source: {doc.metadata.get('source', 'Unknown')})\n")
+        context = buf.getvalue().rstrip("\n")
+
+        return f"""
             You are a helpful travel assistant for Wanderlust Travels, an online travel agency.
             Use the following information from our knowledge base to answer the customer's question.
 
@@ -130,17 +319,3 @@ class TravelSearchEngine:
             Please provide a clear, helpful, and accurate answer based on the information above.
             If the information is not sufficient, let the customer know and provide general guidance.
             """
-
-            # Generate response using LLM
-            response = self.llm.invoke(prompt).content
-
-            # Validate output using governance gate
-            gov_check = self.governance_gate.validate_output(response)
-
-            if not gov_check['passed']:
-                return "I generated a response but it didn't pass safety checks. Please rephrase your question."
-
-            # Log response to MLflow as text file
-            mlflow.log_text(response, "final_response.txt")
-
-            return response
\ No newline at end of file
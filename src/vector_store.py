@@ -1,8 +1,18 @@
+import logging
 import os
+import threading
 from dotenv import load_dotenv
 load_dotenv()
 from langchain_community.vectorstores import AzureSearch
 
+logger = logging.getLogger(__name__)
+
+# One AzureSearch instance per (endpoint, index, embeddings client): construction
+# opens connection pools and probes the index, so it is done once per process
+_vector_stores = {}
+_vector_stores_lock = threading.Lock()
+
+
 def get_vector_store(embedding_function):
     # Read directly from env to avoid Config caching issue
     endpoint = os.getenv("AZURE_SEARCH_ENDPOINT")
@@ -16,13 +26,22 @@ def get_vector_store(embedding_function):
     if not index_name:
         raise ValueError("AZURE_SEARCH_INDEX_NAME must be set.")
 
-    # Initialize AzureSearch vector store
-    vector_store = AzureSearch(
-        azure_search_endpoint=endpoint,
-        azure_search_key=key,
-        index_name=index_name,
-        embedding_function=embedding_function.embed_query
-    )
+    # The cached store keeps embedding_function alive, so its id() stays unique
+    cache_key = (endpoint, key, index_name, id(embedding_function))
+    with _vector_stores_lock:
+        vector_store = _vector_stores.get(cache_key)
+        if vector_store is not None:
+            return vector_store
+
+        # Initialize AzureSearch vector store (pass the Embeddings object, not
+        # embed_query, so add_texts/add_documents embed in one batched request)
+        vector_store = AzureSearch(
+            azure_search_endpoint=endpoint,
+            azure_search_key=key,
+            index_name=index_name,
+            embedding_function=embedding_function
+        )
+        _vector_stores[cache_key] = vector_store
 
-    print(f"Initialized Azure AI Search (LangChain) for index '{index_name}'")
+    logger.info(f"Initialized Azure AI Search (LangChain) for index '{index_name}'")
     return vector_store
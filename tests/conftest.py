@@ -0,0 +1,4 @@
+def pytest_configure(config):
+    # Tests that share state outside their own process (files, ports, MLflow runs)
+    # are marked serial and kept out of the parallel `pytest -n auto` job
+    config.addinivalue_line("markers", "serial: test is not safe to run under pytest-xdist")
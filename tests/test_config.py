@@ -2,6 +2,11 @@
 Basic unit tests for the LLMOps pipeline.
 Add more comprehensive tests as needed.
 """
+import os
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 from src.config import Config
 
@@ -21,3 +26,16 @@ def test_mlflow_config():
     """Test MLflow configuration."""
     assert Config.MLFLOW_TRACKING_URI is not None
     assert Config.MLFLOW_EXPERIMENT_NAME is not None
+
+
+def test_invalid_log_level_falls_back_to_info():
+    """An unknown LOG_LEVEL warns and uses INFO instead of failing the import."""
+    proc = subprocess.run(
+        [sys.executable, "-c", "from src.config import Config; print(Config.LOG_LEVEL)"],
+        cwd=Path(__file__).resolve().parents[1],
+        env={**os.environ, "LOG_LEVEL": "LOUD"},
+        capture_output=True, text=True, timeout=60
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == "INFO"
+    assert "Unknown LOG_LEVEL 'LOUD', using INFO" in proc.stderr
@@ -0,0 +1,25 @@
+import pandas as pd
+import pytest
+
+from src.data_loader import _row_contents, _row_contents_arrow
+
+pytest.importorskip("pyarrow")
+
+CSV_CASES = {
+    "plain": "city,country\nParis,France\nDelhi,India\n",
+    "missing-values": "city,code,note\nParis,,None\nDelhi,NA,n/a\nRome,null,<NA>\n",
+    "quoted": 'route,fare\n"Delhi, Mumbai","1,200"\n"Paris ""CDG""",80\n',
+    "numbers-keep-text-form": "flight,price\n007,10.50\n042,1e3\n",
+    "duplicate-headers": "a,a,b\n1,2,3\n4,5,6\n",
+    "blank-header": ",city\n0,Paris\n1,Delhi\n",
+    "bom": "\ufeffcity,country\nParis,France\n",
+}
+
+
+@pytest.mark.parametrize("content", CSV_CASES.values(), ids=CSV_CASES.keys())
+def test_arrow_rows_match_pandas(tmp_path, content):
+    """The pyarrow path renders exactly what the pandas path renders for the same CSV"""
+    csv_path = tmp_path / "rows.csv"
+    csv_path.write_text(content, encoding="utf-8")
+
+    assert _row_contents_arrow(csv_path) == _row_contents(pd.read_csv(csv_path, dtype=str))
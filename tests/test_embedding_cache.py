@@ -0,0 +1,114 @@
+import sqlite3
+
+import pytest
+
+from src.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings:
+    """Stands in for the Azure client: deterministic vectors, records every text it embeds"""
+
+    def __init__(self):
+        self.documents = []
+        self.queries = []
+
+    def embed_documents(self, texts):
+        self.documents.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return [float(len(text)), 2.0]
+
+
+@pytest.fixture
+def base():
+    return CountingEmbeddings()
+
+
+def test_embed_documents_dedups_by_content_hash(tmp_path, base):
+    """Repeated texts are embedded once per call and served from disk afterwards"""
+    cache = CachedEmbeddings(base, tmp_path / "emb.sqlite", namespace="model-a")
+
+    assert cache.embed_documents(["baggage", "visa", "baggage"]) == [[7.0, 1.0], [4.0, 1.0], [7.0, 1.0]]
+    assert base.documents == ["baggage", "visa"]
+
+    assert cache.embed_documents(["visa", "baggage"]) == [[4.0, 1.0], [7.0, 1.0]]
+    assert base.documents == ["baggage", "visa"]
+
+
+def test_embed_documents_keys_entries_by_model(tmp_path, base):
+    """A different namespace (embedding deployment) never reuses another model's vectors"""
+    path = tmp_path / "emb.sqlite"
+    CachedEmbeddings(base, path, namespace="model-a").embed_documents(["baggage"])
+    CachedEmbeddings(base, path, namespace="model-b").embed_documents(["baggage"])
+    CachedEmbeddings(base, path, namespace="model-a").embed_documents(["baggage"])
+
+    assert base.documents == ["baggage", "baggage"]
+
+
+def test_embed_documents_falls_back_when_cache_is_unusable(tmp_path, base):
+    """An unwritable cache location embeds through the base client instead of failing"""
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    cache = CachedEmbeddings(base, blocker / "emb.sqlite")
+
+    assert cache.embed_documents(["baggage", "visa"]) == [[7.0, 1.0], [4.0, 1.0]]
+    assert cache.embed_documents(["baggage"]) == [[7.0, 1.0]]
+    assert base.documents == ["baggage", "visa", "baggage"]
+
+
+def test_embed_documents_falls_back_when_database_is_locked(tmp_path, base, monkeypatch):
+    """sqlite errors such as a locked database degrade to uncached embedding"""
+    cache = CachedEmbeddings(base, tmp_path / "emb.sqlite")
+
+    def locked():
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(cache, "_connect", locked)
+    assert cache.embed_documents(["baggage"]) == [[7.0, 1.0]]
+    assert base.documents == ["baggage"]
+
+
+def test_embed_query_hit_and_miss(tmp_path, base):
+    """A repeated query is served from memory; a new one goes to the base client"""
+    cache = CachedEmbeddings(base, tmp_path / "emb.sqlite")
+
+    assert cache.embed_query("baggage") == [7.0, 2.0]
+    assert cache.embed_query("baggage") == [7.0, 2.0]
+    assert cache.embed_query("visa") == [4.0, 2.0]
+    assert base.queries == ["baggage", "visa"]
+
+
+def test_embed_query_keys_apart_from_documents(tmp_path, base):
+    """A document of the same text never answers a query (or the other way round)"""
+    cache = CachedEmbeddings(base, tmp_path / "emb.sqlite")
+    cache.embed_documents(["baggage"])
+
+    assert cache.embed_query("baggage") == [7.0, 2.0]
+    assert base.queries == ["baggage"]
+
+
+def test_embed_query_warm_restart(tmp_path, base):
+    """Saved query vectors are reused by the next process without calling the base client"""
+    path = tmp_path / "emb.sqlite"
+    first = CachedEmbeddings(base, path)
+    first.embed_query("baggage")
+    first.save_queries()
+
+    restarted = CachedEmbeddings(base, path)
+    assert restarted.embed_query("baggage") == [7.0, 2.0]
+    assert base.queries == ["baggage"]
+
+
+def test_embed_query_falls_back_when_cache_is_unusable(tmp_path, base):
+    """Load and save failures are logged; queries still embed and the load is retried"""
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    cache = CachedEmbeddings(base, blocker / "emb.sqlite")
+
+    assert cache.embed_query("baggage") == [7.0, 2.0]
+    assert cache.embed_query("baggage") == [7.0, 2.0]
+    cache.save_queries()
+    assert base.queries == ["baggage"]
+    assert cache._queries_loaded is False
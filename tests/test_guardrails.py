@@ -0,0 +1,33 @@
+import pytest
+
+import guardrails.content_safety as content_safety
+import guardrails.re_backend as re_backend
+from guardrails.content_safety import ContentSafety
+from guardrails.pii_detector import PIIDetector
+
+# A lone surrogate (e.g. from a bad decode) cannot be encoded as UTF-8
+UNENCODABLE = "mail jane@example.com \ud800 from 10.0.0.1"
+
+
+@pytest.mark.parametrize("use_re2", [True, False], ids=["re2", "stdlib-re"])
+def test_pii_detector_handles_unencodable_text(monkeypatch, use_re2):
+    """PII patterns still match around a character RE2 cannot encode"""
+    if not use_re2:
+        monkeypatch.setattr(re_backend, "re2", None)
+    detector = PIIDetector()
+
+    found = {(entity.type, entity.text) for entity in detector.detect(UNENCODABLE)['entities']}
+    assert found == {('email', 'jane@example.com'), ('ip_address', '10.0.0.1')}
+    assert detector.redact(UNENCODABLE) == "mail [EMAIL_REDACTED] \ud800 from [IP_ADDRESS_REDACTED]"
+
+
+@pytest.mark.parametrize("use_ahocorasick", [True, False], ids=["ahocorasick", "bytes-find"])
+def test_content_safety_handles_unencodable_text(monkeypatch, use_ahocorasick):
+    """Keyword matching on either backend finds the same hits around a lone surrogate"""
+    if not use_ahocorasick:
+        monkeypatch.setattr(content_safety, "ahocorasick", None)
+    checker = ContentSafety()
+
+    result = checker.check("how to smuggle \ud800 a fake passport")
+    assert result['safe'] is False
+    assert {flag.text for flag in result['flags']} == {'smuggle', 'fake passport', 'ass'}
@@ -1,8 +1,17 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import create_autospec, patch
+from langchain_core.vectorstores import VectorStore
+from langchain_openai import AzureChatOpenAI, AzureOpenAIEmbeddings
+from governance.governance_gate import GovernanceGate
+from src import search_engine
 from src.search_engine import TravelSearchEngine
+from src.vector_store import get_vector_store
 
-@pytest.fixture(autouse=True)
+# Document-shaped search results, built once and shared by every test
+FAKE_DOCS = [SimpleNamespace(page_content="Baggage allowance is 23kg", metadata={"source": "policy.pdf"})]
+
+@pytest.fixture(scope="module", autouse=True)
 def mock_config():
     with patch("src.config.Config") as MockConfig:
         MockConfig.AZURE_OPENAI_API_KEY = "fake-key"
@@ -13,33 +22,53 @@ def mock_config():
         MockConfig.MLFLOW_TRACKING_URI = None
         yield MockConfig
 
+@pytest.fixture(scope="class")
+def search_engine_mocks():
+    """Azure clients, vector store and governance gate patched once for the whole test class"""
+    # Autospecs follow the real signatures, so calls or attributes that drift
+    # from the LangChain / governance APIs fail here instead of passing silently
+    mocks = {
+        "AzureChatOpenAI": create_autospec(AzureChatOpenAI),
+        "AzureOpenAIEmbeddings": create_autospec(AzureOpenAIEmbeddings),
+        "get_vector_store": create_autospec(
+            get_vector_store, return_value=create_autospec(VectorStore, instance=True)
+        ),
+        "GovernanceGate": create_autospec(GovernanceGate),
+    }
+    # Governance passes every query unless a test says otherwise
+    mocks["GovernanceGate"].return_value.validate_input.return_value = {"passed": True, "violations": []}
+
+    # The LLM and embeddings clients are cached process-wide; start and end
+    # empty so the engine is built from the mocks and they don't outlive the class
+    search_engine._build_llm.cache_clear()
+    search_engine._build_embeddings.cache_clear()
+    with patch.multiple("src.search_engine", **mocks):
+        yield mocks
+    search_engine._build_llm.cache_clear()
+    search_engine._build_embeddings.cache_clear()
+
+@pytest.fixture(scope="class")
+def engine(search_engine_mocks):
+    """One engine shared by the class; its vector store is get_vector_store's return value"""
+    return TravelSearchEngine()
+
 class TestTravelSearchEngine:
-    @patch("src.search_engine.AzureChatOpenAI")
-    @patch("src.search_engine.AzureOpenAIEmbeddings")
-    @patch("src.search_engine.get_vector_store")
-    def test_initialization(self, mock_store, mock_embed, mock_chat):
-        engine = TravelSearchEngine()
+    @pytest.fixture(autouse=True)
+    def reset_mocks(self, engine, search_engine_mocks):
+        """Keep call history and cached searches from leaking between tests"""
+        yield
+        for mock in search_engine_mocks.values():
+            mock.reset_mock()
+        engine._search_cache.clear()
+
+    def test_initialization(self, engine):
         assert engine is not None
 
-    @patch("src.search_engine.AzureChatOpenAI")
-    @patch("src.search_engine.AzureOpenAIEmbeddings")
-    @patch("src.search_engine.get_vector_store")
-    def test_search_by_text(self, mock_store, mock_embed, mock_chat):
+    def test_search_by_text(self, engine, search_engine_mocks):
         # Mock vector store
-        mock_vector_store = MagicMock()
-        mock_store.return_value = mock_vector_store
-        mock_vector_store.similarity_search.return_value = [
-            MagicMock(page_content="Baggage allowance is 23kg", metadata={"source": "policy.pdf"})
-        ]
+        search_engine_mocks["get_vector_store"].return_value.similarity_search.return_value = FAKE_DOCS
+        
+        results, query = engine.search_by_text("baggage rules", k=3)
         
-        # Mock governance gate
-        with patch("src.search_engine.GovernanceGate") as MockGate:
-            mock_gate_instance = MagicMock()
-            MockGate.return_value = mock_gate_instance
-            mock_gate_instance.validate_input.return_value = {"passed": True, "violations": []}
-            
-            engine = TravelSearchEngine()
-            results, query = engine.search_by_text("baggage rules", k=3)
-            
-            assert len(results) > 0
-            assert query == "baggage rules"
\ No newline at end of file
+        assert len(results) > 0
+        assert query == "baggage rules"